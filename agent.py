@@ -1,5 +1,6 @@
 """Harbor installed agent for microcode CLI."""
 
+import functools
 import os
 import shlex
 from pathlib import Path
@@ -9,6 +10,16 @@ from harbor.agents.installed.base import BaseInstalledAgent
 from harbor import AgentContext
 
 
+# Host env vars forwarded into the container for microcode
+PASSTHROUGH_ENV_VARS = ("OPENROUTER_API_KEY", "WANDB_API_KEY", "WANDB_PROJECT")
+
+
+@functools.lru_cache(maxsize=None)
+def _env(key: str) -> str:
+    """Look up a host env var once per process."""
+    return os.getenv(key, "")
+
+
 class ExecInput(BaseModel):
     command: str
     cwd: str | None = None
@@ -46,9 +57,9 @@ class MicrocodeInstalledAgent(BaseInstalledAgent):
         self.max_tokens = max_tokens
         self.timeout_sec = timeout_sec
         self.verbose = verbose
-        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY", "")
-        self.wandb_project = wandb_project or os.getenv("WANDB_PROJECT", "")
-        self.wandb_key = wandb_key or os.getenv("WANDB_API_KEY", "")
+        self.api_key = api_key or _env("OPENROUTER_API_KEY")
+        self.wandb_project = wandb_project or _env("WANDB_PROJECT")
+        self.wandb_key = wandb_key or _env("WANDB_API_KEY")
         self.env = env
         self.track_trace = track_trace
 
@@ -83,37 +94,21 @@ class MicrocodeInstalledAgent(BaseInstalledAgent):
             "--max-tokens",
             str(self.max_tokens),
         ]
-        if self.api_key:
-            args.extend(["--api-key", self.api_key])
-        if self.verbose:
-            args.append("--verbose")
-        if getattr(self, "track_trace", False):
-            args.append("--track-trace")
-        if self.wandb_project:
-            args.extend(["--wandb-project", self.wandb_project])
-        if self.wandb_key:
-            args.extend(["--wandb-key", self.wandb_key])
-        if self.env:
-            args.extend(["--env", self.env])
-
-        command = " ".join(shlex.quote(arg) for arg in args)
-
-        env = {}
-        openrouter_key = os.getenv(
-            "OPENROUTER_API_KEY",
+        optional_args = (
+            (self.api_key, ("--api-key", self.api_key)),
+            (self.verbose, ("--verbose",)),
+            (getattr(self, "track_trace", False), ("--track-trace",)),
+            (self.wandb_project, ("--wandb-project", self.wandb_project)),
+            (self.wandb_key, ("--wandb-key", self.wandb_key)),
+            (self.env, ("--env", self.env)),
         )
-        wandb_key = os.getenv(
-            "WANDB_API_KEY",
-        )
-        wandb_project = os.getenv(
-            "WANDB_PROJECT",
-        )
-        if openrouter_key:
-            env["OPENROUTER_API_KEY"] = openrouter_key
-        if wandb_key:
-            env["WANDB_API_KEY"] = wandb_key
-        if wandb_project:
-            env["WANDB_PROJECT"] = wandb_project
+        args.extend(arg for enabled, group in optional_args if enabled for arg in group)
+
+        # Harbor runs commands as a shell string in the container, so args must
+        # stay quoted; an argv list would not survive the environment's exec.
+        command = shlex.join(args)
+
+        env = {key: _env(key) for key in PASSTHROUGH_ENV_VARS if _env(key)}
 
         return [
             ExecInput(
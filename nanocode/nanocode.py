@@ -1,4 +1,15 @@
+import functools
+import itertools
+import mmap
 import os
+import re
+import shlex
+import shutil
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from modaic import PrecompiledProgram, PrecompiledConfig
 import dspy
 import weave
@@ -17,9 +28,57 @@ YELLOW = "\033[33m"
 RED = "\033[31m"
 MAGENTA = "\033[35m"
 
+# Tool banners, prebuilt with their colors so each call is a single %-format
+_READ_FMT = MAGENTA + "⏺ Reading file(%s) (~%s tokens)" + RESET
+_WRITE_FMT = MAGENTA + "⏺ %s file(%s) (%d lines, ~%s tokens)" + RESET
+_EDIT_FMT = MAGENTA + "⏺ Edit(%s)" + RESET
+_GLOB_FMT = MAGENTA + "⏺ Glob(%s): %s" + RESET
+_GREP_FMT = MAGENTA + "⏺ Grep: %s" + RESET
+_BASH_FMT = MAGENTA + "⏺ Bash: %s" + RESET
+
+# ripgrep can undercount usable CPUs in containers, so pin its thread count
+RG_THREADS = str(os.process_cpu_count() or 1)
+
+# Repeated grep_files calls within this window are served without re-running rg
+GREP_CACHE_TTL = 5.0  # seconds
+_grep_cache: dict[tuple, tuple[float, str]] = {}
+
+# edit_file searches files above this size in place via mmap
+MMAP_EDIT_THRESHOLD = 1 << 20  # bytes
+
 # --- File operations ---
 
 
+@functools.lru_cache(maxsize=None)
+def _rg() -> str:
+    """Resolve the ripgrep binary once so each search skips the PATH lookup."""
+    return shutil.which("rg") or "rg"
+
+
+def _run_rg(cmd: list[str]) -> str:
+    """Run ripgrep, capturing raw bytes and decoding them in one pass."""
+    result = subprocess.run(cmd, capture_output=True, timeout=30)
+    return result.stdout.decode("utf-8", "replace").strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _read_numbered(
+    path: str, mtime_ns: int, size: int, offset: int, limit: int | None
+) -> str:
+    """Read a line window with line numbers, memoized on the file's stat identity.
+
+    mtime_ns and size are only part of the cache key: any write to the file
+    changes them, so stale entries are simply never hit again.
+    """
+    # Stream only the requested window instead of loading the whole file
+    with open(path, "r", buffering=65536) as f:
+        stop = offset + limit if limit is not None else sys.maxsize
+        selected = list(itertools.islice(f, offset, stop))
+    return "".join(
+        ["%4d| %s" % (lineno, line) for lineno, line in enumerate(selected, offset + 1)]
+    )
+
+
 def read_file(path: str, offset: int = 0, limit: int = None) -> str:
     """[EXTERNAL FILESYSTEM] Read file contents from disk with line numbers.
 
@@ -31,18 +90,55 @@ def read_file(path: str, offset: int = 0, limit: int = None) -> str:
     Returns:
         File contents with line numbers
     """
-    lines = open(path).readlines()
-    if limit is None:
-        limit = len(lines)
-    selected = lines[offset : offset + limit]
-    content = "".join(
-        f"{offset + idx + 1:4}| {line}" for idx, line in enumerate(selected)
+    st = os.stat(path)
+    content = _read_numbered(
+        os.path.abspath(path), st.st_mtime_ns, st.st_size, offset, limit
     )
     tokens = len(content) // 4  # ~4 chars per token estimate
-    print(f"{MAGENTA}⏺ Reading file({path}) (~{tokens:,} tokens){RESET}")
+    print(_READ_FMT % (path, format(tokens, ",")))
     return content
 
 
+def read_files(paths: list[str], offset: int = 0, limit: int = None) -> list[str]:
+    """[EXTERNAL FILESYSTEM] Read several files from disk at once, with line numbers.
+
+    Prefer this over calling read_file() in a loop; the reads run concurrently.
+
+    Args:
+        paths: Paths of the files to read
+        offset: Line number to start from in each file (0-indexed)
+        limit: Maximum number of lines to read from each file
+
+    Returns:
+        File contents with line numbers, in the same order as paths; a file that
+        cannot be read yields an 'error: ...' string instead
+    """
+
+    def read_one(path: str) -> str:
+        try:
+            return read_file(path, offset, limit)
+        except (OSError, UnicodeDecodeError) as e:
+            return f"error: {e}"
+
+    if not paths:
+        return []
+    # File reads release the GIL, so threads overlap the disk I/O
+    with ThreadPoolExecutor(max_workers=min(16, len(paths))) as ex:
+        return list(ex.map(read_one, paths))
+
+
+def _write_text(path: str, content: str) -> bytes:
+    """Encode content once and write it in a single binary write, skipping TextIOWrapper."""
+    data = content.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    # Our own writes must never be hidden by a cached read or grep; a same-size
+    # rewrite within one mtime tick would otherwise hit the _read_numbered key
+    _read_numbered.cache_clear()
+    _grep_cache.clear()
+    return data
+
+
 def write_file(path: str, content: str) -> str:
     """[EXTERNAL FILESYSTEM] Write content to a file on disk (creates or overwrites).
 
@@ -61,17 +157,39 @@ def write_file(path: str, content: str) -> str:
     if parent:
         os.makedirs(parent, exist_ok=True)
 
-    with open(path, "w") as f:
-        f.write(content)
+    data = _write_text(path, content)
 
-    lines = content.count("\n") + (1 if content and not content.endswith("\n") else 0)
+    lines = data.count(b"\n") + (1 if data and data[-1:] != b"\n" else 0)
     tokens = len(content) // 4
-    print(
-        f"{MAGENTA}⏺ {action} file({path}) ({lines} lines, ~{tokens:,} tokens){RESET}"
-    )
+    print(_WRITE_FMT % (action, path, lines, format(tokens, ",")))
     return f"ok: wrote {lines} lines ({tokens:,} tokens) to {path}"
 
 
+def _edit_mmap(path: str, old: str, new: str, replace_all: bool) -> str | None:
+    """Try to settle an edit on a large file without loading it into a str.
+
+    Returns the tool result when the mmap search is conclusive (not found, or a
+    unique same-length replacement done in place), otherwise None so the caller
+    falls back to the read-modify-write path.
+    """
+    old_b, new_b = old.encode("utf-8"), new.encode("utf-8")
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+        idx = mm.find(old_b)
+        if idx < 0:
+            # Text-mode reads translate CRLF, so only trust a miss on LF-only files
+            return None if mm.find(b"\r") >= 0 else "error: old_string not found"
+        if replace_all or len(new_b) != len(old_b):
+            return None
+        if mm.find(old_b, idx + len(old_b)) >= 0:
+            return None  # duplicate; the text path reports the exact count
+        mm[idx : idx + len(old_b)] = new_b
+        mm.flush()
+    # Size is unchanged and mtime may not tick, so drop cached reads explicitly
+    _read_numbered.cache_clear()
+    _grep_cache.clear()
+    return "ok"
+
+
 def edit_file(path: str, old: str, new: str, replace_all: bool = False) -> str:
     """[EXTERNAL FILESYSTEM] Replace text in a file on disk.
 
@@ -84,17 +202,25 @@ def edit_file(path: str, old: str, new: str, replace_all: bool = False) -> str:
     Returns:
         'ok' on success, error message on failure
     """
-    print(f"{MAGENTA}⏺ Edit({path}){RESET}")
+    print(_EDIT_FMT % path)
+
+    if not old:
+        return "error: old_string must not be empty"
+
+    if os.path.getsize(path) > MMAP_EDIT_THRESHOLD:
+        result = _edit_mmap(path, old, new, replace_all)
+        if result is not None:
+            return result
 
     text = open(path).read()
-    if old not in text:
+    # One pass: splitting at most twice is enough to tell "missing" from "unique"
+    parts = text.split(old) if replace_all else text.split(old, 2)
+    if len(parts) == 1:
         return "error: old_string not found"
-    count = text.count(old)
-    if not replace_all and count > 1:
+    if len(parts) > 2 and not replace_all:
+        count = text.count(old)
         return f"error: old_string appears {count} times, must be unique (use replace_all=True)"
-    replacement = text.replace(old, new) if replace_all else text.replace(old, new, 1)
-    with open(path, "w") as f:
-        f.write(replacement)
+    _write_text(path, new.join(parts))
     return "ok"
 
 
@@ -110,18 +236,21 @@ def glob_files(pattern: str, path: str = ".") -> str:
     Returns:
         Newline-separated list of matching files
     """
-    print(f"{MAGENTA}⏺ Glob({pattern}): {path}{RESET}")
-
-    cmd = ["rg", "--files", "--no-require-git", "-g", pattern, path]
+    print(_GLOB_FMT % (pattern, path))
+
+    # Let ripgrep stat and sort by mtime (newest first) while it walks
+    cmd = [
+        _rg(),
+        "--files",
+        "--no-require-git",
+        "--sortr=modified",
+        f"-j{RG_THREADS}",
+        "-g",
+        pattern,
+        path,
+    ]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        files = result.stdout.strip().split("\n") if result.stdout.strip() else []
-        files = sorted(
-            files,
-            key=lambda f: os.path.getmtime(f) if os.path.isfile(f) else 0,
-            reverse=True,
-        )
-        return "\n".join(files) or "no files found"
+        return _run_rg(cmd) or "no files found"
     except FileNotFoundError:
         return "error: ripgrep (rg) not installed - install with 'brew install ripgrep'"
     except subprocess.TimeoutExpired:
@@ -129,30 +258,61 @@ def glob_files(pattern: str, path: str = ".") -> str:
 
 
 def grep_files(
-    pattern: str, path: str = ".", glob: str = None, max_results: int = 50
+    pattern: str | list[str],
+    path: str = ".",
+    glob: str = None,
+    max_results: int = 50,
+    file_type: str = None,
 ) -> str:
     """[EXTERNAL FILESYSTEM] Search files on disk for a regex pattern using ripgrep.
 
+    Pass a list of patterns to search for all of them in a single ripgrep pass
+    instead of calling grep_files once per pattern.
+
     Args:
-        pattern: Regular expression pattern to search for
+        pattern: Regular expression pattern to search for, or a list of patterns
+            (a line matches if any pattern matches)
         path: Base directory to search in
         glob: Optional glob pattern to filter files (e.g., '*.py')
         max_results: Maximum number of results to return
+        file_type: Optional ripgrep file type to restrict the search to (e.g., 'py');
+            faster than a glob since non-matching files are never opened
 
     Returns:
         Matching lines in format 'filepath:line_num:content'
     """
-    print(f"{MAGENTA}⏺ Grep: {pattern}{RESET}")
-
-    cmd = ["rg", "-n", "--no-heading", "--color=never", f"-m{max_results}"]
+    patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+    print(_GREP_FMT % " | ".join(patterns))
+
+    cmd = [
+        _rg(),
+        "-n",
+        "--no-heading",
+        "--color=never",
+        f"-m{max_results}",
+        f"-j{RG_THREADS}",
+        "--max-columns=500",
+        "--max-columns-preview",
+    ]
     if glob:
         cmd.extend(["-g", glob])
-    cmd.extend([pattern, path])
+    if file_type:
+        cmd.extend(["-t", file_type])
+    for p in patterns:
+        cmd.extend(["-e", p])
+    cmd.append(path)
+
+    key = (tuple(patterns), path, glob, max_results, file_type)
+    cached = _grep_cache.get(key)
+    if cached and time.monotonic() - cached[0] < GREP_CACHE_TTL:
+        return cached[1]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        output = result.stdout.strip()
-        return output if output else "no matches found"
+        output = _run_rg(cmd) or "no matches found"
+        if len(_grep_cache) >= 256:
+            _grep_cache.clear()
+        _grep_cache[key] = (time.monotonic(), output)
+        return output
     except FileNotFoundError:
         return "error: ripgrep (rg) not installed - install with 'brew install ripgrep'"
     except subprocess.TimeoutExpired:
@@ -161,34 +321,111 @@ def grep_files(
 
 # --- Shell operations ---
 
+# Anything that needs a shell to interpret (pipes, redirects, globs, quoting, ...)
+_SHELL_METACHARS = re.compile(r"[|&;<>()$`\\\"'*?\[\]{}~!#\n]")
+
+
+def _spawn(cmd: str) -> subprocess.Popen:
+    """Start cmd directly when it is a plain argv, otherwise via /bin/sh."""
+    # Own process group so a timeout can kill the command and everything it spawned
+    popen_kwargs = dict(
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, process_group=0
+    )
+    argv = None if _SHELL_METACHARS.search(cmd) else shlex.split(cmd)
+    if argv:
+        try:
+            return subprocess.Popen(argv, **popen_kwargs)
+        except OSError:
+            # shell builtins (cd, export, ...), VAR=value prefixes, and scripts
+            # without a shebang (ENOEXEC) that /bin/sh still knows how to run
+            pass
+    return subprocess.Popen(cmd, shell=True, **popen_kwargs)
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    """SIGKILL the process group started by _spawn."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
 
-def run_bash(cmd: str) -> str:
+def run_bash(cmd: str, timeout: int = 300) -> str:
     """[EXTERNAL SYSTEM] Run a shell command on the host machine.
 
     Args:
         cmd: Shell command to execute
+        timeout: Seconds before the command is killed, however much output it
+            produces. Pass a larger value for long builds, installs, or test suites
 
     Returns:
         Command output (stdout and stderr combined)
     """
-    print(f"{MAGENTA}⏺ Bash: {cmd}{RESET}")
+    print(_BASH_FMT % cmd)
+    # The command may change files on disk, possibly within one mtime tick
+    _read_numbered.cache_clear()
+    _grep_cache.clear()
 
-    proc = subprocess.Popen(
-        cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
-    )
+    proc = _spawn(cmd)
     output_lines = []
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        _kill_group(proc)
+
+    # Bound the whole call, not just the wait after output ends
+    timer = threading.Timer(timeout, on_timeout)
+    timer.daemon = True
+    timer.start()
+
+    def emit(raws: list[bytes]):
+        # One stdout write per chunk read instead of one print per line
+        lines = [raw.decode("utf-8", "replace") for raw in raws]
+        sys.stdout.write(
+            "".join([f"  {DIM}│ {line.rstrip()}{RESET}\n" for line in lines])
+        )
+        sys.stdout.flush()
+        output_lines.extend([line + "\n" for line in lines])
+
+    # Read the pipe in 64KB chunks rather than one syscall per line
+    fd = proc.stdout.fileno()
+    pending: list[bytes] = []  # pieces of the current unfinished line
+
+    def feed(chunk: bytes):
+        # Split only the new chunk so long lines aren't re-copied every read
+        *lines, tail = chunk.split(b"\n")
+        if lines:
+            lines[0] = b"".join([*pending, lines[0]])
+            pending.clear()
+            emit(lines)
+        if tail:
+            pending.append(tail)
+
+    carry_cr = False  # chunk ended in \r; it may be the first half of \r\n
     try:
-        while True:
-            line = proc.stdout.readline()
-            if not line and proc.poll() is not None:
-                break
-            if line:
-                print(f"  {DIM}│ {line.rstrip()}{RESET}", flush=True)
-                output_lines.append(line)
-        proc.wait(timeout=30)
-    except subprocess.TimeoutExpired:
-        proc.kill()
-        output_lines.append("\n(timed out after 30s)")
+        while chunk := os.read(fd, 65536):
+            if carry_cr:
+                chunk = b"\r" + chunk
+            carry_cr = chunk.endswith(b"\r")
+            if carry_cr:
+                chunk = chunk[:-1]
+            # Universal newlines, like the text-mode pipe: \r\n and bare \r -> \n
+            feed(chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n"))
+        if carry_cr:
+            feed(b"\n")
+        if pending:
+            emit([b"".join(pending)])
+        proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:  # interrupted while reading
+            _kill_group(proc)
+    if timed_out.is_set():
+        output_lines.append(
+            f"\n(timed out after {timeout}s; rerun with a larger timeout if it"
+            " was still making progress)"
+        )
     return "".join(output_lines).strip() or "(empty output)"
 
 
@@ -213,12 +450,12 @@ class CodingAssistant(dspy.Signature):
 
     1. INTERNAL REPL (sandbox): Standard Python code you write executes in an isolated sandbox. Variables persist between iterations. Use for data processing, string manipulation, logic, loops, etc.
 
-    2. EXTERNAL TOOLS (real system): Functions like read_file(), write_file(), run_bash(), glob_files(), grep_files() execute OUTSIDE the sandbox on the real filesystem and host machine. These have real, persistent side effects.
+    2. EXTERNAL TOOLS (real system): Functions like read_file(), read_files(), write_file(), run_bash(), glob_files(), grep_files() execute OUTSIDE the sandbox on the real filesystem and host machine. These have real, persistent side effects.
 
     When you need to:
     - Process data, do math, manipulate strings, iterate → write Python code directly in the REPL
-    - Read/write actual files on disk → call read_file(), write_file(), edit_file()
-    - Run shell commands on the host → call run_bash()
+    - Read/write actual files on disk → call read_file() (or read_files() for several at once), write_file(), edit_file()
+    - Run shell commands on the host → call run_bash() (killed after 300s by default; pass a larger timeout, e.g. run_bash(cmd, timeout=1200), for builds, installs, and test suites)
     - Search the codebase → call glob_files(), grep_files()
 
     Make sure to check if a file was created by reading it after creating it. 
@@ -280,6 +517,7 @@ class RLMCodingProgram(PrecompiledProgram):
         self.config = config
         self.tools = {
             "read_file": read_file,
+            "read_files": read_files,
             "write_file": write_file,
             "edit_file": edit_file,
             "glob_files": glob_files,
@@ -315,7 +553,9 @@ class RLMCodingProgram(PrecompiledProgram):
     def add_logging_callbacks(self):
         """Add logging callbacks to the agent."""
 
-        self.agent.generate_action.callbacks.append(RLMReasoningCallback())
+        callbacks = self.agent.generate_action.callbacks
+        if not any(isinstance(cb, RLMReasoningCallback) for cb in callbacks):
+            callbacks.append(RLMReasoningCallback())
         self._patch_llm_tools()
 
     def _patch_llm_tools(self):
@@ -324,6 +564,8 @@ class RLMCodingProgram(PrecompiledProgram):
         orig_factory = (
             self.agent._make_llm_tools
         )  # capture the original bound method directly
+        if getattr(orig_factory, "_is_verbose", False):
+            return  # already patched; don't stack another wrapper layer
 
         def verbose_factory(max_workers=8):
             tools = orig_factory(
@@ -332,6 +574,8 @@ class RLMCodingProgram(PrecompiledProgram):
 
             orig_q = tools["llm_query"]
             orig_b = tools["llm_query_batched"]
+            if getattr(orig_q, "_is_verbose", False):
+                return tools  # tools already carry our logging wrappers
 
             def wrapped_q(prompt):  # wrap query
                 print(
@@ -353,10 +597,12 @@ class RLMCodingProgram(PrecompiledProgram):
                 print(f"{DIM}⏺ [LLM QUERY BATCHED]:\n{len(res)} results{RESET}\n")
                 return res
 
+            wrapped_q._is_verbose = wrapped_b._is_verbose = True
             tools["llm_query"] = wrapped_q
             tools["llm_query_batched"] = wrapped_b
             return tools
 
+        verbose_factory._is_verbose = True
         self.agent._make_llm_tools = verbose_factory
 
     def forward(self, task: str) -> str:
@@ -12,20 +12,52 @@ This script:
 """
 
 import asyncio
+import errno
+import functools
+import hashlib
 import json
 import os
 import shutil
-import subprocess
 import time
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Set
+from typing import AsyncIterator, Set
+
+try:
+    from watchfiles import awatch
+except ImportError:  # no inotify watcher available; fall back to polling
+    awatch = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
 
 # Configuration
 JOBS_DIR = Path("jobs")
 FAILED_DIR = Path("failed-jobs")
 POLL_INTERVAL = 10  # seconds between scans
 PROCESSED_FILE = Path(".processed_failed_jobs.json")
+STATE_FLUSH_INTERVAL = 5  # seconds between writes of PROCESSED_FILE
+COPY_CONCURRENCY = min(32, (os.cpu_count() or 1) * 4)  # parallel artifact copies
+REFLECTION_CONCURRENCY = 3  # jobs reflected on at once (OpenRouter rate limit)
+HARDLINK_ARTIFACTS = False  # hardlink instead of copying (same filesystem only)
+# Task files whose creation/rewrite can change whether a task counts as failed
+WATCHED_FILES = {"reward.txt", "stdout.txt", "test-stdout.txt"}
+
+# find_failed_tasks scan caches: job dir -> (mtime_ns, task listing), and
+# task dir -> result for tasks whose verifier has finished
+RACY_MTIME_WINDOW_NS = 2_000_000_000  # don't trust dir mtimes younger than this
+_job_listings: dict[str, tuple[int, list[tuple[str, str]]]] = {}
+_settled_tasks: dict[str, "FailedTask | None"] = {}
+
+# In-memory copy of PROCESSED_FILE; save_state() only marks it dirty
+_state: dict | None = None
+_state_dirty = False
+
+_reflection_slots = asyncio.Semaphore(REFLECTION_CONCURRENCY)
+_signature_lock = asyncio.Lock()  # one writer of nanocode/nanocode.py at a time
 
 
 @dataclass
@@ -40,141 +72,514 @@ class FailedTask:
     reward: int
 
 
+def load_state() -> dict:
+    """Load the monitor state, reading PROCESSED_FILE on first use only."""
+    global _state
+    if _state is None:
+        _state = {}
+        if PROCESSED_FILE.exists() and orjson is not None:
+            _state = orjson.loads(PROCESSED_FILE.read_bytes())
+        elif PROCESSED_FILE.exists():
+            with open(PROCESSED_FILE) as f:
+                _state = json.load(f)
+    return _state
+
+
+def save_state(**updates) -> None:
+    """Merge updates into the monitor state, keeping other keys.
+
+    The file itself is written by state_flusher() / flush_state(), so bursts of
+    updates cost one write per STATE_FLUSH_INTERVAL.
+    """
+    global _state_dirty
+    load_state().update(updates)
+    _state_dirty = True
+
+
+def write_state(data: dict) -> None:
+    """Write state to PROCESSED_FILE via a temp file and atomic rename."""
+    tmp = PROCESSED_FILE.with_name(PROCESSED_FILE.name + ".tmp")
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+    os.replace(tmp, PROCESSED_FILE)
+
+
+def flush_state() -> None:
+    """Write the monitor state now if it changed since the last write."""
+    global _state_dirty
+    if _state_dirty:
+        _state_dirty = False
+        write_state(dict(_state))
+
+
+async def state_flusher() -> None:
+    """Write the monitor state every STATE_FLUSH_INTERVAL seconds if it changed."""
+    global _state_dirty
+    while True:
+        await asyncio.sleep(STATE_FLUSH_INTERVAL)
+        if not _state_dirty:
+            continue
+        # Snapshot on the loop thread; the loaders hand out copies and save_state()
+        # replaces values, so nothing in the snapshot is mutated while it's written
+        _state_dirty = False
+        try:
+            await asyncio.to_thread(write_state, dict(_state))
+        except Exception as e:  # keep flushing after a bad write
+            print(f"Error saving {PROCESSED_FILE}: {e}")
+            _state_dirty = True
+
+
 def load_processed_jobs() -> Set[str]:
     """Load the set of already processed job IDs."""
-    if PROCESSED_FILE.exists():
-        with open(PROCESSED_FILE) as f:
-            data = json.load(f)
-            return set(data.get("processed_jobs", []))
-    return set()
+    return set(load_state().get("processed_jobs", []))
 
 
 def save_processed_jobs(processed: Set[str]) -> None:
     """Save the set of processed job IDs."""
-    with open(PROCESSED_FILE, "w") as f:
-        json.dump({"processed_jobs": list(processed)}, f, indent=2)
+    save_state(processed_jobs=list(processed))
 
 
-def find_failed_tasks() -> list[FailedTask]:
-    """Scan jobs directory for failed tasks (reward.txt == 0)."""
-    failed_tasks = []
+def load_copied_tasks() -> set[tuple[str, str]]:
+    """Load the (job_id, task_id) pairs whose artifacts are fully copied."""
+    return {tuple(key) for key in load_state().get("copied_tasks", [])}
 
-    if not JOBS_DIR.exists():
-        return failed_tasks
 
-    for job_dir in JOBS_DIR.iterdir():
-        if not job_dir.is_dir():
-            continue
+def save_copied_tasks(copied: set[tuple[str, str]]) -> None:
+    """Save the (job_id, task_id) pairs whose artifacts are fully copied."""
+    save_state(copied_tasks=sorted(copied))
 
-        job_id = job_dir.name
 
-        for task_dir in job_dir.iterdir():
-            if not task_dir.is_dir():
-                continue
+def load_trigger_hashes() -> dict[str, str]:
+    """Load the failure-set hash each job was last reflected on."""
+    return dict(load_state().get("trigger_hashes", {}))
+
+
+def save_trigger_hashes(hashes: dict[str, str]) -> None:
+    """Save the failure-set hash each job was last reflected on."""
+    save_state(trigger_hashes=dict(hashes))
+
+
+@functools.lru_cache(maxsize=16384)
+def read_reward(path: str, mtime_ns: int, size: int) -> int | None:
+    """Parse reward.txt, memoized by stat identity so unchanged files aren't re-read."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            buf = os.read(fd, 16)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+
+    # Fast path for the usual "0" / "1", with or without a trailing newline
+    if buf[:1] in (b"0", b"1") and buf[1:] in (b"", b"\n"):
+        return buf[0] - 0x30  # ord("0")
+    try:
+        return int(buf.strip())
+    except ValueError:
+        return None
+
+
+def check_task(
+    job_id: str, task_id: str, task_dir: str
+) -> tuple[FailedTask | None, bool]:
+    """Check the task at jobs/{job_id}/{task_id} for failure (reward.txt == 0).
+
+    Returns (task, settled): the task if it failed, else None, and whether the
+    verifier has finished with a parseable reward, so the result can't change.
+    """
+    # Plain string paths; Path objects are only built for tasks that failed
+    reward_file = f"{task_dir}/verifier/reward.txt"
+    trajectory_file = f"{task_dir}/agent/command-0/stdout.txt"
+    test_stdout_file = f"{task_dir}/verifier/test-stdout.txt"
 
-            task_id = task_dir.name
-            reward_file = task_dir / "verifier" / "reward.txt"
-            trajectory_file = task_dir / "agent" / "command-0" / "stdout.txt"
-            test_stdout_file = task_dir / "verifier" / "test-stdout.txt"
+    try:
+        st = os.stat(reward_file)
+    except OSError:
+        return None, False
+
+    # An empty or half-written reward.txt doesn't settle the task
+    reward = read_reward(reward_file, st.st_mtime_ns, st.st_size)
+    if reward is None:
+        return None, False
+
+    has_test_stdout = os.path.exists(test_stdout_file)
+    if reward != 0:
+        return None, has_test_stdout
+
+    # reward == 0 means failed tests
+    if not os.path.exists(trajectory_file):
+        return None, False
+    task = FailedTask(
+        job_id=job_id,
+        task_id=task_id,
+        job_path=Path(task_dir),
+        trajectory_path=Path(trajectory_file),
+        test_result_path=Path(test_stdout_file) if has_test_stdout else None,
+        reward=reward,
+    )
+    return task, has_test_stdout
+
+
+def failure_set_hash(tasks: list[FailedTask]) -> str:
+    """Fingerprint a job's failed tasks by task id and trajectory size."""
+    entries = []
+    for task in tasks:
+        try:
+            size = task.trajectory_path.stat().st_size
+        except OSError:
+            size = 0
+        entries.append(size.to_bytes(8, "little") + task.task_id.encode())
+    return hashlib.blake2b(b"".join(sorted(entries)), digest_size=16).hexdigest()
+
+
+def list_job_tasks(job_entry: os.DirEntry) -> list[tuple[str, str]]:
+    """List (task_id, task_dir) under a job dir, reusing the last listing if unchanged.
+
+    A directory's mtime moves whenever an entry is added or removed, so an equal
+    st_mtime_ns means the same set of task dirs. Listings taken within
+    RACY_MTIME_WINDOW_NS of the mtime aren't cached, since a task dir created in
+    the same timestamp tick would not move it again.
+    """
+    mtime_ns = job_entry.stat().st_mtime_ns
+    cached = _job_listings.get(job_entry.path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    with os.scandir(job_entry.path) as tasks:
+        listing = [(task.name, task.path) for task in tasks if task.is_dir()]
+    if cached:
+        for task_dir in {path for _, path in cached[1]} - {path for _, path in listing}:
+            _settled_tasks.pop(task_dir, None)
+    if time.time_ns() - mtime_ns > RACY_MTIME_WINDOW_NS:
+        _job_listings[job_entry.path] = (mtime_ns, listing)
+    return listing
+
+
+def find_failed_tasks() -> tuple[list[FailedTask], Counter[str]]:
+    """Scan jobs directory for failed tasks (reward.txt == 0).
+
+    Job dirs whose mtime hasn't moved reuse their previous task listing, and tasks
+    whose verifier already finished reuse their previous result, so a steady-state
+    scan only touches jobs and tasks that are still in progress.
+
+    Returns the failed tasks and the number of failed tasks per job_id.
+    """
+    failed_tasks = []
+    job_counts: Counter[str] = Counter()
 
-            if not reward_file.exists():
+    try:
+        jobs = os.scandir(JOBS_DIR)
+    except FileNotFoundError:
+        return failed_tasks, job_counts
+
+    seen_jobs = set()
+    # scandir's DirEntry.is_dir() answers from the cached dirent type, no stat
+    with jobs:
+        for job_entry in jobs:
+            if not job_entry.is_dir():
                 continue
+            seen_jobs.add(job_entry.path)
+
+            for task_id, task_dir in list_job_tasks(job_entry):
+                if task_dir in _settled_tasks:
+                    task = _settled_tasks[task_dir]
+                else:
+                    task, settled = check_task(job_entry.name, task_id, task_dir)
+                    if settled:
+                        _settled_tasks[task_dir] = task
+                if task:
+                    failed_tasks.append(task)
+                    job_counts[task.job_id] += 1
+
+    # Forget job dirs that were removed (e.g. `make clear-jobs`)
+    for job_path in _job_listings.keys() - seen_jobs:
+        for _, task_dir in _job_listings.pop(job_path)[1]:
+            _settled_tasks.pop(task_dir, None)
+
+    return failed_tasks, job_counts
+
+
+def changed_task_dirs(changes: set[tuple[object, str]]) -> set[tuple[str, str]]:
+    """Map watcher change events to the (job_id, task_id) pairs they touch."""
+    jobs_root = os.path.abspath(JOBS_DIR)
+    touched = set()
+    for _, path in changes:
+        if os.path.basename(path) not in WATCHED_FILES:
+            continue
+        parts = os.path.relpath(os.path.abspath(path), jobs_root).split(os.sep)
+        if len(parts) < 3 or parts[0] == "..":
+            continue
+        touched.add((parts[0], parts[1]))
+    return touched
+
+
+def scan_failed_tasks() -> tuple[list[FailedTask], Counter[str]] | None:
+    """Run find_failed_tasks(), logging errors and returning None instead.
+
+    Scans race with harbor creating and removing dirs (a job dir can vanish
+    between scandir and stat), so one failed scan must not stop the monitor.
+    """
+    try:
+        return find_failed_tasks()
+    except Exception as e:
+        print(f"Error scanning {JOBS_DIR}: {e}")
+        return None
 
+
+async def watch_failed_tasks(
+    previous: list[FailedTask],
+) -> AsyncIterator[tuple[list[FailedTask], Counter[str]]]:
+    """Yield failed tasks and per-job counts whenever filesystem events change them.
+
+    Only task dirs named in events are re-examined. Errors propagate, so the
+    caller can restart the watch with a fresh scan.
+    """
+    while not JOBS_DIR.exists():
+        await asyncio.sleep(POLL_INTERVAL)
+    # Catch anything created between the previous scan and the watch starting
+    failed_tasks, job_counts = find_failed_tasks()
+    failed = {(t.job_id, t.task_id): t for t in failed_tasks}
+    if failed_tasks != previous:
+        yield failed_tasks, +job_counts
+    async for changes in awatch(JOBS_DIR):
+        changed = False
+        for job_id, task_id in changed_task_dirs(changes):
+            key = (job_id, task_id)
+            task_dir = os.path.join(JOBS_DIR, job_id, task_id)
+            task, _ = check_task(job_id, task_id, task_dir)
+            if task:
+                previous_task = failed.get(key)
+                if previous_task is None:
+                    job_counts[job_id] += 1
+                if task != previous_task:  # new failure, or its test results landed
+                    failed[key] = task
+                    changed = True
+            elif failed.pop(key, None):
+                job_counts[job_id] -= 1
+                changed = True
+        if changed:
+            # Unary + copies the counter, dropping jobs whose count fell to zero
+            yield list(failed.values()), +job_counts
+
+
+async def failed_task_updates(
+    one_shot: bool = False, watch: bool = True
+) -> AsyncIterator[tuple[list[FailedTask], Counter[str]]]:
+    """Yield the current failed tasks and per-job counts after each change.
+
+    With a watcher, updates come from watch_failed_tasks(), which is restarted
+    after any error; otherwise the whole jobs directory is rescanned every
+    POLL_INTERVAL seconds. Errors are logged here and never end the iteration,
+    since a closed generator would stop the monitor for good.
+    """
+    while (initial := scan_failed_tasks()) is None:
+        if one_shot:
+            return
+        await asyncio.sleep(POLL_INTERVAL)
+    yield initial
+    if one_shot:
+        return
+
+    if watch:
+        previous = initial[0]
+        while True:
             try:
-                reward = int(reward_file.read_text().strip())
-            except (ValueError, IOError):
-                continue
+                async for update in watch_failed_tasks(previous):
+                    previous = update[0]
+                    yield update
+            except Exception as e:
+                print(f"Error watching {JOBS_DIR}: {e}")
+            await asyncio.sleep(POLL_INTERVAL)  # then restart with a fresh scan
+    else:
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            update = scan_failed_tasks()
+            if update is not None:
+                yield update
 
-            # reward == 0 means failed tests
-            if reward == 0 and trajectory_file.exists():
-                failed_tasks.append(
-                    FailedTask(
-                        job_id=job_id,
-                        task_id=task_id,
-                        job_path=task_dir,
-                        trajectory_path=trajectory_file,
-                        test_result_path=test_stdout_file
-                        if test_stdout_file.exists()
-                        else None,
-                        reward=reward,
-                    )
-                )
 
-    return failed_tasks
+# errnos meaning "this zero-copy syscall can't handle these fds", not a real failure
+_ZERO_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP}
 
 
-def copy_failed_artifacts(tasks: list[FailedTask]) -> dict[str, list[str]]:
-    """Copy failed task artifacts to failed-jobs directory.
+def fast_copy(src: Path, dst: Path) -> None:
+    """Copy src to dst without pulling the bytes through Python buffers.
 
-    Returns a dict mapping job_id to list of task_ids that were copied.
+    Hardlinks when HARDLINK_ARTIFACTS is set (trajectories are never rewritten),
+    otherwise tries copy_file_range, then sendfile, then shutil.copyfile. Only
+    the bytes are copied: failed-jobs/ is ours, so mode bits and other metadata
+    aren't worth the extra stat/chmod per file.
     """
-    jobs_with_new_failures: dict[str, list[str]] = {}
+    if HARDLINK_ARTIFACTS:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # different filesystem or no link support; copy instead
+
+    zero_copy = []
+    if hasattr(os, "copy_file_range"):
+        zero_copy.append(lambda infd, outfd: os.copy_file_range(infd, outfd, 1 << 30))
+    if hasattr(os, "sendfile"):
+        zero_copy.append(lambda infd, outfd: os.sendfile(outfd, infd, None, 1 << 30))
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        for copy_chunk in zero_copy:
+            try:
+                while copy_chunk(infd, outfd):
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in _ZERO_COPY_UNSUPPORTED:
+                    raise
+    shutil.copyfile(src, dst)
 
-    for task in tasks:
-        failed_task_dir = FAILED_DIR / task.job_id / task.task_id
-        failed_task_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy trajectory
-        dest_trajectory = failed_task_dir / "trajectory.txt"
-        if not dest_trajectory.exists():
-            shutil.copy(task.trajectory_path, dest_trajectory)
+def copy_task_artifacts(task: FailedTask) -> bool:
+    """Copy one failed task's artifacts into failed-jobs/{job_id}/{task_id}.
 
-            if task.job_id not in jobs_with_new_failures:
-                jobs_with_new_failures[task.job_id] = []
-            jobs_with_new_failures[task.job_id].append(task.task_id)
+    Returns whether both trajectory and test results are now in place.
+    """
+    failed_task_dir = FAILED_DIR / task.job_id / task.task_id
+    failed_task_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy test results if available
-        if task.test_result_path:
-            dest_test = failed_task_dir / "test-case-result.txt"
-            if not dest_test.exists():
-                shutil.copy(task.test_result_path, dest_test)
+    # Copy trajectory
+    dest_trajectory = failed_task_dir / "trajectory.txt"
+    if not dest_trajectory.exists():
+        fast_copy(task.trajectory_path, dest_trajectory)
 
-    return jobs_with_new_failures
+    # Copy test results if available
+    if not task.test_result_path:
+        return False
+    dest_test = failed_task_dir / "test-case-result.txt"
+    if not dest_test.exists():
+        fast_copy(task.test_result_path, dest_test)
+    return True
 
 
-def run_reflection_analysis(job_id: str) -> str:
-    """Run reflection analysis locally using microcode."""
-    failed_job_dir = FAILED_DIR / job_id
-    feedback_path = failed_job_dir / "FEEDBACK.md"
+async def copy_failed_artifacts(
+    tasks: list[FailedTask], copied: set[tuple[str, str]]
+) -> None:
+    """Copy failed task artifacts to failed-jobs directory.
 
-    prompt = f"""Explore the trajectories in the directory failed-jobs/{job_id}. Each task within this directory contains the test results of that task and the agent's trajectories. In one file, FEEDBACK.md, formulate comprehensive feedback and common failure modes that the agent runs into."""
+    Tasks in copied are skipped without touching the filesystem; the rest are
+    copied concurrently on worker threads, at most COPY_CONCURRENCY at a time.
+    Tasks whose trajectory and test results are both in place get added to
+    copied, and the set is persisted once per call. Tasks missing test results
+    stay out of it so later scans pick them up.
+    """
+    pending = [task for task in tasks if (task.job_id, task.task_id) not in copied]
+    if not pending:
+        return
 
-    api_key = os.environ.get("OPENROUTER_API_KEY", "")
-
-    cmd = [
-        "microcode",
-        "task",
-        prompt,
-        "--lm",
-        "openai/gpt-5.2",
-        "--sub-lm",
-        "qwen/qwen3-coder",
-        "--max-iterations",
-        "30",
-        "--max-tokens",
-        "30000",
-        "--verbose",
-    ]
+    sem = asyncio.Semaphore(COPY_CONCURRENCY)
+
+    async def copy_one(task: FailedTask) -> bool:
+        async with sem:
+            return await asyncio.to_thread(copy_task_artifacts, task)
 
-    if api_key:
-        cmd.extend(["--api-key", api_key])
+    results = await asyncio.gather(
+        *(copy_one(task) for task in pending), return_exceptions=True
+    )
+
+    copied_before = len(copied)
+    for task, result in zip(pending, results):
+        if isinstance(result, Exception):
+            print(f"✗ Error copying {task.job_id}/{task.task_id}: {result}")
+            continue
+        if result:
+            copied.add((task.job_id, task.task_id))
+
+    if len(copied) > copied_before:
+        save_copied_tasks(copied)
+
+
+async def forward_stream(stream: asyncio.StreamReader, prefix: str) -> None:
+    """Echo a subprocess pipe line by line as output arrives."""
+    pending: list[bytes] = []  # pieces of the current unfinished line
+    while chunk := await stream.read(65536):
+        # Split only the new chunk so long lines aren't re-copied every read
+        *lines, tail = chunk.split(b"\n")
+        if lines:
+            lines[0] = b"".join([*pending, lines[0]])
+            pending.clear()
+        for line in lines:
+            print(f"{prefix} {line.decode('utf-8', 'replace')}")
+        if tail:
+            pending.append(tail)
+    if pending:
+        print(f"{prefix} {b''.join(pending).decode('utf-8', 'replace')}")
+
+
+# Flags shared by every microcode run, built once at import
+_MICROCODE_FLAGS = [
+    "--lm",
+    "openai/gpt-5.2",
+    "--sub-lm",
+    "qwen/qwen3-coder",
+    "--max-iterations",
+    "30",
+    "--max-tokens",
+    "30000",
+    "--verbose",
+]
+if _api_key := os.environ.get("OPENROUTER_API_KEY", ""):
+    _MICROCODE_FLAGS += ["--api-key", _api_key]
+
+
+async def run_microcode(prompt: str, label: str) -> int | None:
+    """Run one headless microcode task, streaming its output under label.
+
+    Both the reflection and signature-iteration steps go through here, so this is
+    the single place that knows how microcode is launched. Output is forwarded as
+    it is produced rather than buffered for the whole (up to 1500s) run.
+
+    Returns the exit code, or None if it timed out or could not start.
+    """
+    cmd = ["microcode", "task", prompt, *_MICROCODE_FLAGS]
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=1500,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+    except Exception as e:
+        print(f"Error running {label.lower()}: {e}")
+        return None
 
-        print(f"Microcode stdout:\n{result.stdout}")
-        if result.stderr:
-            print(f"Microcode stderr:\n{result.stderr}")
+    forwarders = [
+        asyncio.create_task(forward_stream(proc.stdout, f"[{label}]")),
+        asyncio.create_task(forward_stream(proc.stderr, f"[{label} stderr]")),
+    ]
+    timed_out = False
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=1500)
+    except TimeoutError:
+        timed_out = True
+        print(f"{label} timed out")
+    finally:
+        if proc.returncode is None:  # timed out or cancelled
+            proc.kill()
+            await proc.wait()
+        await asyncio.gather(*forwarders)
 
-    except subprocess.TimeoutExpired:
-        print("Microcode timed out")
-    except Exception as e:
-        print(f"Error running microcode: {e}")
+    return None if timed_out else proc.returncode
+
+
+async def run_reflection_analysis(job_id: str) -> str:
+    """Run reflection analysis locally using microcode."""
+    failed_job_dir = FAILED_DIR / job_id
+    feedback_path = failed_job_dir / "FEEDBACK.md"
+
+    prompt = f"""Explore the trajectories in the directory failed-jobs/{job_id}. Each task within this directory contains the test results of that task and the agent's trajectories. In one file, FEEDBACK.md, formulate comprehensive feedback and common failure modes that the agent runs into."""
+
+    await run_microcode(prompt, f"Microcode {job_id}")
 
     if feedback_path.exists():
         return feedback_path.read_text()
@@ -182,7 +587,7 @@ def run_reflection_analysis(job_id: str) -> str:
     return ""
 
 
-def run_signature_iteration(feedback_path: Path) -> bool:
+async def run_signature_iteration(feedback_path: Path) -> bool:
     """Run microcode to iterate on the CodingAssistant signature based on feedback.
 
     Returns True if the signature was successfully updated.
@@ -206,93 +611,58 @@ Make targeted improvements based on the specific failure patterns identified. Do
 
 After making your changes, confirm what you updated."""
 
-    api_key = os.environ.get("OPENROUTER_API_KEY", "")
-
-    cmd = [
-        "microcode",
-        "task",
-        prompt,
-        "--lm",
-        "openai/gpt-5.2",
-        "--sub-lm",
-        "qwen/qwen3-coder",
-        "--max-iterations",
-        "30",
-        "--max-tokens",
-        "30000",
-        "--verbose",
-    ]
-
-    if api_key:
-        cmd.extend(["--api-key", api_key])
-
-    try:
-        print(f"\n>>> Running signature iteration based on {feedback_path}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=1500,
-        )
+    print(f"\n>>> Running signature iteration based on {feedback_path}")
+    return await run_microcode(prompt, "Signature iteration") == 0
 
-        print(f"Signature iteration stdout:\n{result.stdout}")
-        if result.stderr:
-            print(f"Signature iteration stderr:\n{result.stderr}")
 
-        return result.returncode == 0
-
-    except subprocess.TimeoutExpired:
-        print("Signature iteration timed out")
-        return False
-    except Exception as e:
-        print(f"Error running signature iteration: {e}")
-        return False
-
-
-def push_nanocode_to_hub() -> bool:
+async def push_nanocode_to_hub() -> bool:
     """Push the updated nanocode to hub.
 
     Returns True if push was successful.
     """
+    proc = None
     try:
         print("\n>>> Pushing updated nanocode to hub")
-        result = subprocess.run(
-            ["uv", "run", "nanocode.py"],
+        proc = await asyncio.create_subprocess_exec(
+            "uv",
+            "run",
+            "nanocode.py",
             cwd="nanocode",
-            capture_output=True,
-            text=True,
-            timeout=300,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=300)
 
-        print(f"Push stdout:\n{result.stdout}")
-        if result.stderr:
-            print(f"Push stderr:\n{result.stderr}")
+        print(f"Push stdout:\n{stdout.decode('utf-8', 'replace')}")
+        if stderr:
+            print(f"Push stderr:\n{stderr.decode('utf-8', 'replace')}")
 
-        if result.returncode == 0:
+        if proc.returncode == 0:
             print("✓ Successfully pushed nanocode to hub")
             return True
         else:
-            print(f"✗ Push failed with return code {result.returncode}")
+            print(f"✗ Push failed with return code {proc.returncode}")
             return False
 
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         print("Push timed out")
         return False
     except Exception as e:
         print(f"Error pushing to hub: {e}")
         return False
+    finally:
+        if proc is not None and proc.returncode is None:  # timed out or cancelled
+            proc.kill()
+            await proc.wait()
 
 
-def print_status(failed_tasks: list[FailedTask], processed_jobs: Set[str]) -> None:
-    """Print current status."""
-    jobs_summary: dict[str, int] = {}
-    for task in failed_tasks:
-        jobs_summary[task.job_id] = jobs_summary.get(task.job_id, 0) + 1
+def print_status(jobs_summary: Counter[str], processed_jobs: Set[str]) -> None:
+    """Print current status from the per-job failed task counts."""
 
     print("\n" + "=" * 60)
     print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Status Update")
     print("=" * 60)
-    print(f"Total failed tasks found: {len(failed_tasks)}")
+    print(f"Total failed tasks found: {jobs_summary.total()}")
     print(f"Jobs with failures: {len(jobs_summary)}")
     print(f"Already processed jobs: {len(processed_jobs)}")
 
@@ -302,77 +672,139 @@ def print_status(failed_tasks: list[FailedTask], processed_jobs: Set[str]) -> No
     print("=" * 60 + "\n")
 
 
-async def monitor_loop(one_shot: bool = False) -> None:
+async def process_job(
+    job_id: str,
+    count: int,
+    digest: str,
+    last_analyzed_count: dict[str, int],
+    trigger_hashes: dict[str, str],
+) -> None:
+    """Run reflection, then signature iteration and hub push, for one job.
+
+    Reflections for different jobs run concurrently (up to REFLECTION_CONCURRENCY
+    at once); signature iteration and push edit the shared nanocode/nanocode.py,
+    so those steps are serialized across jobs.
+    """
+    print(
+        f"\n>>> Running reflection analysis for job: {job_id} (failed count: {count})"
+    )
+
+    try:
+        async with _reflection_slots:
+            feedback = await run_reflection_analysis(job_id)
+
+        if feedback:
+            print(f"✓ Generated FEEDBACK.md for {job_id}")
+            last_analyzed_count[job_id] = count
+            trigger_hashes[job_id] = digest
+            save_trigger_hashes(trigger_hashes)
+
+            # Run signature iteration based on feedback
+            feedback_path = FAILED_DIR / job_id / "FEEDBACK.md"
+            async with _signature_lock:
+                if await run_signature_iteration(feedback_path):
+                    print(f"✓ Updated CodingAssistant signature for {job_id}")
+                    # Push updated nanocode to hub
+                    if await push_nanocode_to_hub():
+                        print(f"✓ Pushed new revision to hub for {job_id}")
+                    else:
+                        print(f"✗ Failed to push to hub for {job_id}")
+                else:
+                    print(f"✗ Failed to update signature for {job_id}")
+        else:
+            print(f"✗ No feedback generated for {job_id}")
+
+    except Exception as e:
+        print(f"✗ Error processing {job_id}: {e}")
+
+
+async def monitor_loop(one_shot: bool = False, poll: bool = False) -> None:
     """Main monitoring loop."""
     processed_jobs = load_processed_jobs()
+    copied_tasks = load_copied_tasks()
     last_analyzed_count: dict[str, int] = {}  # Track last count when we ran analysis
+    trigger_hashes = load_trigger_hashes()  # Failure set each job was reflected on
+    in_flight: dict[str, asyncio.Task] = {}  # Jobs whose workflow is still running
+    flusher = asyncio.create_task(state_flusher())
+    watch = awatch is not None and not poll
 
     print("Starting reflection monitor")
     print(f"Watching: {JOBS_DIR.absolute()}")
     print(f"Output: {FAILED_DIR.absolute()}")
-    print(f"Poll interval: {POLL_INTERVAL}s")
+    if watch:
+        print("Change detection: filesystem events (watchfiles)")
+    else:
+        print(f"Poll interval: {POLL_INTERVAL}s")
     print("Analysis triggers every 10 failed tasks per job")
     print()
 
+    latest: tuple[list[FailedTask], Counter[str]] = ([], Counter())
+
+    def start_reflections(
+        failed_tasks: list[FailedTask], tasks_by_job: Counter[str], job_ids
+    ) -> None:
+        """Start the workflow for each job that crossed a new multiple of 10."""
+        eligible: list[tuple[str, int, str]] = []
+        for job_id in job_ids:
+            if job_id in in_flight:
+                continue  # re-checked by on_job_done when the run finishes
+            count = tasks_by_job[job_id]
+            last_count = last_analyzed_count.get(job_id, 0)
+            # Check if we've crossed a new multiple of 10
+            if count >= 10 and (count // 10) > (last_count // 10):
+                # Skip if this exact failure set was already reflected on
+                digest = failure_set_hash(
+                    [task for task in failed_tasks if task.job_id == job_id]
+                )
+                if digest == trigger_hashes.get(job_id):
+                    print(f"[{job_id}] failures unchanged, skipping reflection")
+                    last_analyzed_count[job_id] = count
+                else:
+                    eligible.append((job_id, count, digest))
+            elif count < 10:
+                print(f"[{job_id}] {count} failed tasks (waiting for 10)")
+
+        # Run in the background so scanning continues during long runs
+        for job_id, count, digest in eligible:
+            job_task = asyncio.create_task(
+                process_job(job_id, count, digest, last_analyzed_count, trigger_hashes)
+            )
+            in_flight[job_id] = job_task
+            job_task.add_done_callback(
+                lambda _, job_id=job_id, count=count: on_job_done(job_id, count)
+            )
+
+    def on_job_done(job_id: str, started_count: int) -> None:
+        """Mark a job's run finished and re-check failures that arrived meanwhile."""
+        in_flight.pop(job_id, None)
+        # Failures that arrived mid-run were skipped; in watch mode no new event
+        # may come to re-check them, so check the latest counts now
+        failed_tasks, tasks_by_job = latest
+        if tasks_by_job[job_id] > started_count:
+            start_reflections(failed_tasks, tasks_by_job, [job_id])
+
+    updates = failed_task_updates(one_shot, watch)
     while True:
         try:
-            # Find all failed tasks
-            failed_tasks = find_failed_tasks()
+            # Wait for the next scan or batch of filesystem events
+            update = await anext(updates, None)
+            if update is None:
+                break
+            latest = update
+            failed_tasks, tasks_by_job = update
 
             if failed_tasks:
                 # Copy artifacts
-                copy_failed_artifacts(failed_tasks)
+                await copy_failed_artifacts(failed_tasks, copied_tasks)
 
                 # Print status
-                print_status(failed_tasks, processed_jobs)
-
-                # Group failed tasks by job_id
-                tasks_by_job: dict[str, int] = {}
-                for task in failed_tasks:
-                    tasks_by_job[task.job_id] = tasks_by_job.get(task.job_id, 0) + 1
+                print_status(tasks_by_job, processed_jobs)
 
                 # Run reflection analysis when failed count is a multiple of 10
-                for job_id, count in tasks_by_job.items():
-                    last_count = last_analyzed_count.get(job_id, 0)
-                    # Check if we've crossed a new multiple of 10
-                    if count >= 10 and (count // 10) > (last_count // 10):
-                        print(
-                            f"\n>>> Running reflection analysis for job: {job_id} (failed count: {count})"
-                        )
-
-                        try:
-                            feedback = run_reflection_analysis(job_id)
-
-                            if feedback:
-                                print(f"✓ Generated FEEDBACK.md for {job_id}")
-                                last_analyzed_count[job_id] = count
-
-                                # Run signature iteration based on feedback
-                                feedback_path = FAILED_DIR / job_id / "FEEDBACK.md"
-                                if run_signature_iteration(feedback_path):
-                                    print(f"✓ Updated CodingAssistant signature for {job_id}")
-                                    # Push updated nanocode to hub
-                                    if push_nanocode_to_hub():
-                                        print(f"✓ Pushed new revision to hub for {job_id}")
-                                    else:
-                                        print(f"✗ Failed to push to hub for {job_id}")
-                                else:
-                                    print(f"✗ Failed to update signature for {job_id}")
-                            else:
-                                print(f"✗ No feedback generated for {job_id}")
-
-                        except Exception as e:
-                            print(f"✗ Error processing {job_id}: {e}")
-                    elif count < 10:
-                        print(f"[{job_id}] {count} failed tasks (waiting for 10)")
+                start_reflections(failed_tasks, tasks_by_job, list(tasks_by_job))
             else:
                 print(f"[{time.strftime('%H:%M:%S')}] No failed tasks found")
 
-            if one_shot:
-                break
-
-            await asyncio.sleep(POLL_INTERVAL)
-
         except KeyboardInterrupt:
             print("\nStopping monitor...")
             break
@@ -380,7 +812,11 @@ async def monitor_loop(one_shot: bool = False) -> None:
             print(f"Error in monitor loop: {e}")
             if one_shot:
                 break
-            await asyncio.sleep(POLL_INTERVAL)
+
+    # Let in-progress reflections finish (one-shot mode exits right after a scan)
+    while in_flight:
+        await asyncio.gather(*in_flight.values())
+    flusher.cancel()
 
 
 def main():
@@ -401,6 +837,17 @@ def main():
         default=10,
         help="Seconds between scans (default: 10)",
     )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Rescan on an interval instead of watching for filesystem events "
+        "(use for NFS-mounted job dirs where inotify is unreliable)",
+    )
+    parser.add_argument(
+        "--hardlink-artifacts",
+        action="store_true",
+        help="Hardlink trajectories into failed-jobs/ instead of copying them",
+    )
     parser.add_argument(
         "--reset-processed",
         action="store_true",
@@ -409,14 +856,18 @@ def main():
 
     args = parser.parse_args()
 
-    global POLL_INTERVAL
+    global POLL_INTERVAL, HARDLINK_ARTIFACTS
     POLL_INTERVAL = args.poll_interval
+    HARDLINK_ARTIFACTS = args.hardlink_artifacts
 
     if args.reset_processed and PROCESSED_FILE.exists():
         PROCESSED_FILE.unlink()
         print("Reset processed jobs list")
 
-    asyncio.run(monitor_loop(one_shot=args.one_shot))
+    try:
+        asyncio.run(monitor_loop(one_shot=args.one_shot, poll=args.poll))
+    finally:
+        flush_state()  # Persist anything the flusher hadn't written yet
 
 
 if __name__ == "__main__":